@@ -3,47 +3,89 @@ __all__ = [
     "BaseCommuter",
 ]
 
-from contextlib import contextmanager
-from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import islice
+from uuid import uuid4
+import threading
+from typing import (
+    Any,
+    ContextManager,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import abc
 
 import numpy as np
-import psycopg2
 from psycopg2 import sql
-from psycopg2.extensions import register_adapter, AsIs
-from psycopg2.extras import execute_batch
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_INERROR,
+    AsIs,
+    connection,
+    make_dsn,
+    register_adapter,
+)
+from psycopg2.extras import execute_values
 
 from . import exc
 
 QueryParams = Union[Sequence[Any], Mapping[str, Any]]
+BatchParams = Iterable[Sequence[Any]]
+Row = Tuple[Any, ...]
+DEFAULT_PAGE_SIZE = 1000
+_TConnector = TypeVar("_TConnector", bound="BaseConnector")
+_CONNECT_KEYWORDS = ("connection_factory", "cursor_factory", "async", "async_")
+_TCommuter = TypeVar("_TCommuter", bound="BaseCommuter")
 register_adapter(np.int64, AsIs)
 register_adapter(np.float64, AsIs)
 
 
 class BaseConnector(abc.ABC):
-    """Base class for all connectors."""
+    """Base class for all connectors.
 
-    def __init__(self, **kwargs: str) -> None:
+    Connector can be used as a context manager, all the connections
+    are closed when leaving the context.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
         self._kwargs = kwargs
 
         if "db_name" in self._kwargs:
             self._kwargs["dbname"] = self._kwargs.pop("db_name")
 
-    def __del__(self) -> None:
+        # arguments of psycopg2.connect which aren't libpq options
+        self._connect_kwargs = {
+            key: self._kwargs.pop(key)
+            for key in _CONNECT_KEYWORDS
+            if key in self._kwargs
+        }
+
+        self._dsn = make_dsn(**self._kwargs)
+
+    def __enter__(self: _TConnector) -> _TConnector:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
         self.close_all()
 
     def __repr__(self) -> str:
-        desc = "("
-        for key in ["host", "user", "dbname"]:
-            if key in self._kwargs.keys():
-                desc += key + "=" + self._kwargs[key] + " "
-        desc += ")"
-        return desc
+        desc = " ".join(
+            f"{key}={self._kwargs[key]}"
+            for key in ("host", "user", "dbname")
+            if key in self._kwargs
+        )
+        return f"({desc})"
 
     @abc.abstractmethod
-    @contextmanager
-    def open_connection(self) -> Iterator[psycopg2.connect]:
+    def open_connection(self) -> ContextManager[connection]:
         """Generates a new connection."""
 
         raise NotImplementedError
@@ -58,6 +100,9 @@ class BaseConnector(abc.ABC):
 class BaseCommuter:
     """Base class for all commuters.
 
+    Commuter can be used as a context manager, all the connections
+    are closed when leaving the context.
+
     Args:
         connector:
             Instance of connection handler, any subclass
@@ -66,10 +111,82 @@ class BaseCommuter:
 
     def __init__(self, connector: BaseConnector) -> None:
         self.connector = connector
+        # connection of the transaction opened in the current thread
+        self._local = threading.local()
+
+    def __enter__(self: _TCommuter) -> _TCommuter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
 
     def __repr__(self) -> str:
         return repr(self.connector)
 
+    def close(self) -> None:
+        """Close all the connections handled by the connector."""
+
+        self.connector.close_all()
+
+    @property
+    def _active_conn(self) -> Optional[connection]:
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Execute database operations in a single transaction.
+
+        All the operations executed by the current thread inside
+        the context share the same connection and are committed
+        when leaving the context. If an exception is raised, the whole
+        transaction is rolled back. Nested contexts join the outer
+        transaction.
+
+        Raises:
+            QueryExecutionError: if commit fails or one of the
+                statements failed inside of the context.
+
+        Examples:
+
+            .. code::
+
+                >>> with self.transaction():
+                ...     self.execute("DELETE FROM people WHERE age > 100")
+                ...     self.insert("people", data)
+        """
+
+        if self._active_conn is not None:
+            yield
+            return
+
+        with self.connector.open_connection() as conn:
+            self._local.conn = conn
+            try:
+                yield
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                # commit of the aborted transaction would silently
+                # discard all the statements executed before the failure
+                if conn.info.transaction_status == TRANSACTION_STATUS_INERROR:
+                    conn.rollback()
+                    exc.raise_with_traceback(
+                        exc.QueryExecutionError(
+                            "Transaction is rolled back, since one of "
+                            "its statements failed"
+                        )
+                    )
+                try:
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    exc.raise_with_traceback(
+                        exc.QueryExecutionError(f"Commit failed\n{e}\n")
+                    )
+            finally:
+                self._local.conn = None
+
     def execute(
         self, cmd: Union[str, sql.Composed], values: Optional[QueryParams] = None
     ) -> None:
@@ -89,15 +206,82 @@ class BaseCommuter:
             QueryExecutionError: if execution fails.
         """
 
-        self._execute(cmd=cmd, values=values)
+        self._execute(cmd=cmd, values=values, fetch=False)
+
+    def execute_many(
+        self,
+        cmds: Iterable[Tuple[Union[str, sql.Composed], Optional[QueryParams]]],
+        page_size: int = 100,
+    ) -> None:
+        """Execute a sequence of database operations in a single transaction.
+
+        Commands are bound to their parameters on the client side and
+        joined into pages of ``page_size`` statements, every page is sent
+        to the server in a single round-trip.
+
+        Args:
+            cmds:
+                Sequence of pairs of SQL command and query parameters.
+            page_size:
+                Maximum number of statements sent in a single round-trip.
+
+        Raises:
+            QueryExecutionError: if execution fails.
+
+        Examples:
+
+            .. code::
+
+                >>> self.execute_many([
+                ...     ("INSERT INTO people VALUES (%s, %s)", ("Yeltsin", 72)),
+                ...     ("DELETE FROM people WHERE age > %s", (100,)),
+                ... ])
+        """
+
+        # command or page being executed, reported if execution fails
+        page: Union[str, sql.Composed, bytes] = b""
+
+        with self._open_connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    it = iter(cmds)
+                    while True:
+                        stmts = []
+                        for cmd, values in islice(it, page_size):
+                            page = cmd
+                            stmts += [cur.mogrify(cmd, values)]
+                        if not stmts:
+                            break
+                        # the separator is put on its own line, so it isn't
+                        # swallowed by a trailing "--" comment of a command
+                        page = b"\n;\n".join(stmts)
+                        cur.execute(page)
+                self._commit(conn)
+            except Exception as e:
+                try:
+                    self._rollback(conn)
+                except Exception as ex:
+                    exc.raise_with_traceback(
+                        exc.QueryExecutionError(
+                            f"Execution failed on sql: {page!r}\n{ex}\n "
+                            f"unable to rollback"
+                        )
+                    )
+
+                exc.raise_with_traceback(
+                    exc.QueryExecutionError(f"Execution failed on sql: {page!r}\n{e}\n")
+                )
 
     def _execute(
         self,
         cmd: Union[str, sql.Composed],
-        values: Optional[QueryParams] = None,
-        commit: Optional[bool] = True,
-        batch: Optional[bool] = False,
-    ) -> Tuple[List[Any], List[str]]:
+        values: Optional[Union[QueryParams, BatchParams]] = None,
+        commit: bool = True,
+        batch: bool = False,
+        fetch: bool = True,
+        template: Optional[sql.Composable] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Row], List[str]]:
         """Execute a database operation, query or command.
 
         Args:
@@ -108,7 +292,20 @@ class BaseCommuter:
             commit:
                 Commit the results if True.
             batch:
-                Use execute_batch method if True.
+                Use execute_values method if True, then ``cmd`` must
+                contain a single ``%s`` placeholder for VALUES list
+                and ``values`` is an iterable of rows. If ``fetch`` is
+                True, then ``cmd`` must return rows, e.g. with
+                RETURNING clause.
+            fetch:
+                Fetch the query result if True. Set it to False
+                when the result isn't used by the caller.
+            template:
+                Template used to compose each row of VALUES list
+                with execute_values. Defaults to a row of ``%s``.
+            page_size:
+                Maximum number of rows in each statement
+                composed with execute_values.
 
         Returns:
             List of rows of a query result and list of column names.
@@ -118,29 +315,48 @@ class BaseCommuter:
             QueryExecutionError: if execution fails.
         """
 
-        fetched = []
-        columns = []
+        fetched: List[Row] = []
+        columns: List[str] = []
 
-        with self.connector.open_connection() as conn:
+        with self._open_connection() as conn:
             try:
+                # a single statement is committed by the server itself,
+                # that saves BEGIN and COMMIT round-trips
+                if conn is not self._active_conn:
+                    conn.autocommit = commit and not batch
+
                 with conn.cursor() as cur:
                     if batch:
-                        execute_batch(cur, cmd, values)
+                        # rows returned by all the pages are collected
+                        # by execute_values itself
+                        result = execute_values(
+                            cur,
+                            cmd,
+                            values,
+                            template=(
+                                None if template is None else template.as_string(cur)
+                            ),
+                            page_size=page_size,
+                            fetch=fetch,
+                        )
+                        if fetch:
+                            fetched = result
+                            columns = [desc[0] for desc in cur.description]
                     else:
                         if values is None:
                             cur.execute(cmd)
                         else:
                             cur.execute(cmd, values)
 
-                    if cur.description is not None:
-                        fetched = cur.fetchall()
-                        columns = [desc[0] for desc in cur.description]
+                        if fetch and cur.description is not None:
+                            fetched = cur.fetchall()
+                            columns = [desc[0] for desc in cur.description]
 
-                if commit:
-                    conn.commit()
+                if commit and not conn.autocommit:
+                    self._commit(conn)
             except Exception as e:
                 try:
-                    conn.rollback()
+                    self._rollback(conn)
                 except Exception as ex:
                     exc.raise_with_traceback(
                         exc.QueryExecutionError(
@@ -155,12 +371,99 @@ class BaseCommuter:
 
         return fetched, columns
 
+    def _iter_execute(
+        self,
+        cmd: Union[str, sql.Composed],
+        values: Optional[QueryParams] = None,
+        itersize: int = 10000,
+    ) -> Iterator[Tuple[List[Row], List[str]]]:
+        """Execute a query using server-side cursor and fetch rows in chunks.
+
+        Result set is kept on the server and transferred to the client
+        by chunks of ``itersize`` rows, so the memory footprint doesn't
+        depend on the amount of rows returned by the query.
+
+        Args:
+            cmd:
+                SQL query.
+            values:
+                Query parameters.
+            itersize:
+                Number of rows fetched from the server at a time.
+
+        Yields:
+            List of rows of the next chunk and list of column names.
+
+        Raises:
+            QueryExecutionError: if execution fails.
+        """
+
+        with self._open_connection() as conn:
+            try:
+                with conn.cursor(name=f"pgcom_{uuid4().hex}") as cur:
+                    cur.execute(cmd, values)
+
+                    while True:
+                        fetched = cur.fetchmany(itersize)
+                        if not fetched:
+                            break
+                        yield fetched, [desc[0] for desc in cur.description]
+
+                self._commit(conn)
+            except GeneratorExit:
+                self._rollback(conn)
+                raise
+            except Exception as e:
+                try:
+                    self._rollback(conn)
+                except Exception as ex:
+                    exc.raise_with_traceback(
+                        exc.QueryExecutionError(
+                            f"Execution failed on sql: {cmd}\n{ex}\n "
+                            f"unable to rollback"
+                        )
+                    )
+
+                exc.raise_with_traceback(
+                    exc.QueryExecutionError(f"Execution failed on sql: {cmd}\n{e}\n")
+                )
+
+    def _open_connection(self) -> ContextManager[connection]:
+        """Return connection of the active transaction or a new one."""
+
+        conn = self._active_conn
+        if conn is not None:
+            return nullcontext(conn)
+        return self.connector.open_connection()
+
+    def _commit(self, conn: connection) -> None:
+        """Commit, unless the connection belongs to the active transaction."""
+
+        if conn is not self._active_conn:
+            conn.commit()
+
+    def _rollback(self, conn: connection) -> None:
+        """Rollback, unless the connection belongs to the active transaction.
+
+        Failed transaction is rolled back as a whole
+        when leaving :func:`~pgcom.base.BaseCommuter.transaction`.
+        """
+
+        if conn is not self._active_conn:
+            conn.rollback()
+
     def _get_schema(self, table_name: str) -> Tuple[str, str]:
         """Return schema and table name."""
 
-        names = str.split(table_name, ".")
+        return _split_table_name(table_name)
+
+
+@lru_cache(maxsize=1024)
+def _split_table_name(table_name: str) -> Tuple[str, str]:
+    """Split qualified table name into schema and table name."""
 
-        if len(names) == 2:
-            return names[0], names[1]
-        else:
-            return "public", table_name
+    # names with more than one dot aren't split, as before
+    if table_name.count(".") == 1:
+        schema, name = table_name.split(".")
+        return schema, name
+    return "public", table_name
@@ -1,18 +1,36 @@
 __all__ = ["Commuter"]
 
-from io import StringIO
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+from functools import lru_cache
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
 from psycopg2 import sql
+from psycopg2.extensions import encodings
 
-from . import exc, queries
-from .base import BaseCommuter
+from . import copy_io, exc, queries
+from .base import DEFAULT_PAGE_SIZE, BaseCommuter
 from .connector import Connector
 
 QueryParams = Union[Sequence[Any], Mapping[str, Any]]
 
+_INTEGER_TYPES = frozenset(["smallint", "integer", "bigint"])
+_TEXT_TYPES = frozenset(["text"])
+# minimum number of rows written by COPY when insert method is "auto"
+_COPY_THRESHOLD = 1000
+
 
 class Commuter(BaseCommuter):
     """Communication agent.
@@ -22,6 +40,13 @@ class Commuter(BaseCommuter):
     of Commuter is therefore once per particular database,
     held globally for the lifetime of a single application process.
 
+    Columns, primary and foreign keys of the tables are cached when
+    they are requested for the first time. The cache is dropped by
+    :func:`~pgcom.commuter.Commuter.refresh_metadata` and
+    after executing commands or scripts, which may alter tables.
+    The cache is guarded by a lock, so the instance can be shared
+    between threads.
+
     Args:
         pool_size:
             The maximum amount of connections the pool will support.
@@ -40,13 +65,96 @@ class Commuter(BaseCommuter):
         pool_size: int = 20,
         pre_ping: bool = False,
         max_reconnects: int = 3,
-        **kwargs: str,
+        **kwargs: Any,
     ) -> None:
         super().__init__(Connector(pool_size, pre_ping, max_reconnects, **kwargs))
 
+        self._metadata_cache = {}  # type: Dict[Tuple[str, ...], pd.DataFrame]
+        self._metadata_lock = threading.Lock()
+        # incremented when the cache is dropped
+        self._metadata_generation = 0
+
     def __repr__(self) -> str:
         return repr(self.connector)
 
+    def execute(
+        self, cmd: Union[str, sql.Composed], values: Optional[QueryParams] = None
+    ) -> None:
+        """Execute a database operation (query or command).
+
+        Cached metadata of the tables is dropped after execution,
+        since the command may alter tables.
+
+        Args:
+            cmd:
+                SQL query to be executed.
+            values:
+                Query parameters.
+
+        Raises:
+            QueryExecutionError: if execution fails.
+        """
+
+        try:
+            super().execute(cmd, values=values)
+        finally:
+            self.refresh_metadata()
+
+    def execute_many(
+        self,
+        cmds: Iterable[Tuple[Union[str, sql.Composed], Optional[QueryParams]]],
+        page_size: int = 100,
+    ) -> None:
+        """Execute a sequence of database operations in a single transaction.
+
+        Commands are bound to their parameters on the client side and
+        joined into pages of ``page_size`` statements, every page is sent
+        to the server in a single round-trip. Cached metadata of the tables
+        is dropped after execution, since the commands may alter tables.
+
+        Args:
+            cmds:
+                Sequence of pairs of SQL command and query parameters.
+            page_size:
+                Maximum number of statements sent in a single round-trip.
+
+        Raises:
+            QueryExecutionError: if execution fails.
+        """
+
+        try:
+            super().execute_many(cmds, page_size=page_size)
+        finally:
+            self.refresh_metadata()
+
+    def refresh_metadata(self, table_name: Optional[str] = None) -> None:
+        """Drop cached columns and keys of the tables.
+
+        Call it if the tables were altered bypassing
+        :func:`~pgcom.commuter.Commuter.execute` and
+        :func:`~pgcom.commuter.Commuter.execute_script`.
+
+        Args:
+            table_name:
+                Name of the table, metadata of the other tables is
+                kept in the cache. If not specified, then the whole
+                cache is dropped. Defaults to None.
+        """
+
+        with self._metadata_lock:
+            self._metadata_generation += 1
+
+            if table_name is None:
+                self._metadata_cache.clear()
+                return
+
+            table = self._get_schema(table_name)
+
+            # foreign keys are dropped with both the child and the parent table
+            for key in list(self._metadata_cache):
+                if table in (key[1:3], key[3:5]):
+                    del self._metadata_cache[key]
+
     def select(
         self, cmd: Union[str, sql.Composed], values: Optional[QueryParams] = None
     ) -> pd.DataFrame:
@@ -68,6 +176,40 @@ class Commuter(BaseCommuter):
         df = pd.DataFrame.from_records(records, columns=columns)
         return df
 
+    def select_iter(
+        self,
+        cmd: Union[str, sql.Composed],
+        values: Optional[QueryParams] = None,
+        chunksize: int = 10000,
+    ) -> Iterator[pd.DataFrame]:
+        """Read SQL query into DataFrames by chunks of rows.
+
+        Query result is kept on the server side and fetched by
+        ``chunksize`` rows at a time, so large results can be processed
+        without loading them into memory entirely.
+
+        Args:
+            cmd:
+                string SQL query to be executed.
+            values:
+                Parameters to pass to execute method.
+            chunksize:
+                Number of rows in each DataFrame.
+
+        Yields:
+            Pandas.DataFrame.
+
+        Examples:
+
+            .. code::
+
+                >>> for df in self.select_iter("SELECT * FROM people"):
+                ...     print(len(df))
+        """
+
+        for records, columns in self._iter_execute(cmd, values, itersize=chunksize):
+            yield pd.DataFrame.from_records(records, columns=columns)
+
     def select_one(
         self,
         cmd: Union[str, sql.Composed],
@@ -108,7 +250,10 @@ class Commuter(BaseCommuter):
         with open(path2script, "r") as fh:
             cmd = fh.read()
 
-        self._execute(cmd=cmd)
+        try:
+            self._execute(cmd=cmd, fetch=False)
+        finally:
+            self.refresh_metadata()
 
     def insert(
         self,
@@ -116,6 +261,8 @@ class Commuter(BaseCommuter):
         data: pd.DataFrame,
         columns: Optional[List[str]] = None,
         placeholders: Optional[List[str]] = None,
+        method: str = "batch",
+        page_size: int = DEFAULT_PAGE_SIZE,
     ) -> None:
         """Write rows from a DataFrame to a database table.
 
@@ -130,6 +277,33 @@ class Commuter(BaseCommuter):
             placeholders:
                 List of placeholders. If not specified then the default
                 placeholders are used. Defaults to None.
+            method:
+                One of "auto", "batch", "copy". If "batch", rows are
+                inserted with ``execute_values``, if "copy", rows are
+                streamed to the table with COPY FROM command, which is
+                considerably faster on large DataFrames but doesn't
+                support custom placeholders. If "auto", COPY is used for
+                DataFrames of 1000 rows or more unless placeholders are
+                specified, otherwise rows are inserted with
+                ``execute_values``. Defaults to "batch".
+
+                Note that COPY writes values as CSV, so empty strings
+                are stored as NULL, column names are case-insensitive
+                and the values must have a text representation accepted
+                by the server, e.g. Python lists can't be written to
+                array columns.
+            page_size:
+                Maximum number of rows in each INSERT statement
+                composed with ``execute_values``, i.e. the number of rows
+                sent to the server in a single round-trip. Ignored if
+                method is "copy". Defaults to 1000, consider raising it
+                to 5000-10000 on high-latency links.
+
+        Raises:
+            QueryExecutionError: if rows are inserted with
+                ``execute_values`` and execution fails.
+            CopyError: if rows are written with COPY and execution fails.
+            ValueError: if method is not supported.
 
         Examples:
 
@@ -153,27 +327,45 @@ class Commuter(BaseCommuter):
                 ...     data=data,
                 ...     columns=["name", "geom"],
                 ...     placeholders=["%s", "ST_GeomFromText(%s, 4326)"])
+
+            Use COPY FROM command to write a large DataFrame.
+
+            .. code::
+
+                >>> self.insert("people", data, method="copy")
         """
 
         if columns is None:
             columns = list(data.columns)
 
-        if placeholders is None:
-            placeholders = sql.Placeholder() * len(columns)
-        else:
-            placeholders = sql.Composed([sql.SQL(p) for p in placeholders])
-
-        cmd = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-            sql.SQL(table_name),
-            sql.SQL(", ").join(map(sql.Identifier, columns)),
-            sql.SQL(", ").join(placeholders),
+        if method == "auto":
+            # COPY setup cost dominates on small DataFrames
+            use_copy = placeholders is None and len(data) >= _COPY_THRESHOLD
+            method = "copy" if use_copy else "batch"
+
+        if method == "copy":
+            if placeholders is not None:
+                raise ValueError("custom placeholders are not supported by COPY")
+            self.copy_from(table_name, data[columns])
+            return
+        elif method != "batch":
+            raise ValueError(f"unsupported insert method: {method}")
+
+        cmd = _insert_values_cmd(table_name, tuple(columns))
+        template = None
+
+        if placeholders is not None:
+            template = _values_template(len(columns), tuple(placeholders))
+
+        self._execute(
+            cmd=cmd,
+            values=_iter_rows(data[columns]),
+            batch=True,
+            fetch=False,
+            template=template,
+            page_size=page_size,
         )
 
-        rows = data[columns].to_numpy(na_value=None)
-
-        for values in [tuple(row) for row in rows]:
-            self._execute(cmd=cmd, values=values)
-
     def insert_row(
         self, table_name: str, return_id: Optional[str] = None, **kwargs: Any
     ) -> Optional[int]:
@@ -189,21 +381,78 @@ class Commuter(BaseCommuter):
         """
 
         sid = None
-        keys = list(kwargs.keys())
-
-        cmd = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-            sql.SQL(table_name),
-            sql.SQL(", ").join(map(sql.Identifier, keys)),
-            sql.SQL(", ").join(map(sql.Placeholder, keys)),
-        )
+        cmd = _insert_cmd(table_name, tuple(kwargs.keys()))
+        values = tuple(kwargs.values())
 
         if return_id is not None:
-            sid = self.insert_return(cmd, return_id=return_id, values=kwargs)
+            sid = self.insert_return(cmd, return_id=return_id, values=values)
         else:
-            self._execute(cmd=cmd, values=kwargs)
+            self._execute(cmd=cmd, values=values, fetch=False)
 
         return sid
 
+    def insert_rows(
+        self,
+        table_name: str,
+        rows: Sequence[Mapping[str, Any]],
+        return_id: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Optional[List[int]]:
+        """Insert multiple rows in a single transaction.
+
+        Rows are given as mappings from column names to values, all of
+        them must have the same keys as the first row. Rows are sent
+        to the server by pages of multi-row INSERT commands.
+
+        Args:
+            table_name:
+                Name of the destination table.
+            rows:
+                Sequence of rows to be inserted.
+            return_id:
+                Name of the returned serial key.
+            page_size:
+                Maximum number of rows inserted by a single command.
+
+        Returns:
+            List of serial keys of the inserted rows
+            if ``return_id`` is specified, otherwise None.
+
+        Examples:
+
+            .. code::
+
+                >>> self.insert_rows(
+                ...     "people",
+                ...     [{"name": "Yeltsin", "age": 72}, {"name": "Putin", "age": 47}],
+                ...     return_id="id")
+                [1, 2]
+        """
+
+        if len(rows) == 0:
+            return None if return_id is None else []
+
+        columns = tuple(rows[0].keys())
+        values = [tuple(row[column] for column in columns) for row in rows]
+        cmd = _insert_values_cmd(table_name, columns)
+
+        if return_id is not None:
+            cmd = sql.Composed(
+                [cmd, sql.SQL(" RETURNING {}").format(sql.Identifier(return_id))]
+            )
+
+        fetched, _ = self._execute(
+            cmd=cmd,
+            values=values,
+            batch=True,
+            fetch=return_id is not None,
+            page_size=page_size,
+        )
+
+        if return_id is None:
+            return None
+        return [row[0] for row in fetched]
+
     def insert_return(
         self,
         cmd: Union[str, sql.Composed],
@@ -247,8 +496,14 @@ class Commuter(BaseCommuter):
         sep: str = ",",
         na_value: str = "",
         where: Optional[Union[str, sql.Composed]] = None,
+        binary: bool = False,
+        truncate: bool = False,
+        chunksize: int = 10000,
     ) -> None:
-        """Places DataFrame to a buffer and apply COPY FROM command.
+        """Stream DataFrame to the table with COPY FROM command.
+
+        DataFrame is converted to CSV by chunks of rows while it's being
+        sent to the server, so the whole CSV is never held in memory.
 
         Args:
             table_name:
@@ -267,17 +522,45 @@ class Commuter(BaseCommuter):
                 WHERE clause used to specify a condition while deleting
                 data from the table before applying copy_from,
                 DELETE command is not executed if not specified.
+            binary:
+                If True, DataFrame is streamed to the table in binary
+                format, which saves converting the values to text.
+                Binary format is used only if all the columns have
+                numeric, boolean, datetime or text data types, otherwise
+                the text format is used. Defaults to False.
+            truncate:
+                If True, all the rows are removed from the table with
+                TRUNCATE command before applying copy_from. Then rows
+                are copied with FREEZE option, which is faster when
+                loading the data to an empty table. Can't be used
+                together with ``where``. Defaults to False.
+            chunksize:
+                Number of rows encoded at a time while streaming
+                the DataFrame. Defaults to 10000.
 
         Raises:
             CopyError: if execution fails.
+            ValueError: if both ``where`` and ``truncate`` are specified.
         """
 
-        df = data.copy()
+        if truncate and where is not None:
+            raise ValueError("where can't be used together with truncate")
+
+        df = data
+        # table truncated in the same transaction allows to write frozen rows
+        freeze = ", FREEZE" if truncate else ""
 
         if format_data:
-            df = self._format_data(df, table_name, sep=sep)
+            df = self._format_data(data, table_name, sep=sep)
+
+        data_types = None  # type: Optional[List[Optional[str]]]
+
+        if binary:
+            table_columns = self._table_columns(table_name)
+            types = dict(zip(table_columns["column_name"], table_columns["data_type"]))
+            data_types = [types.get(column) for column in df.columns]
 
-        with self.connector.open_connection() as conn:
+        with self._open_connection() as conn:
             try:
                 with conn.cursor() as cur:
                     if where is not None:
@@ -292,27 +575,48 @@ class Commuter(BaseCommuter):
                             ]
                         )
                         cur.execute(cmd)
-                    # DataFrame to buffer
-                    s_buf = StringIO()
-                    df.to_csv(
-                        path_or_buf=s_buf,
-                        sep=sep,
-                        na_rep=na_value,
-                        index=False,
-                        header=False,
-                    )
-                    s_buf.seek(0)
-                    # copy from buffer
+                    elif truncate:
+                        cur.execute(sql.SQL("TRUNCATE {}").format(sql.SQL(table_name)))
+
                     columns = ", ".join(df.columns)
-                    cmd = (
-                        f"COPY {table_name} ({columns}) FROM STDOUT "
-                        f"DELIMITER '{sep}' NULL '{na_value}'"
-                    )
-                    cur.copy_expert(cmd, s_buf)
-                conn.commit()
+                    encoders = None
+
+                    if data_types is not None:
+                        encoders = copy_io.binary_encoders(
+                            df, data_types, encodings[conn.encoding]
+                        )
+
+                    if encoders is not None:
+                        # stream binary rows encoded by chunks
+                        cmd = (
+                            f"COPY {table_name} ({columns}) FROM STDIN "
+                            f"WITH (FORMAT BINARY{freeze})"
+                        )
+                        reader = copy_io.ChunkedReader(
+                            copy_io.iter_binary(df, encoders, chunksize=chunksize)
+                        )
+                        cur.copy_expert(cmd, reader)
+                    else:
+                        # stream CSV rows encoded by chunks
+                        cmd = (
+                            f"COPY {table_name} ({columns}) FROM STDIN "
+                            f"WITH (FORMAT CSV, DELIMITER '{sep}', "
+                            f"NULL '{na_value}'{freeze})"
+                        )
+                        reader = copy_io.ChunkedReader(
+                            copy_io.iter_csv(
+                                df,
+                                sep,
+                                na_value,
+                                encodings[conn.encoding],
+                                chunksize=chunksize,
+                            )
+                        )
+                        cur.copy_expert(cmd, reader)
+                self._commit(conn)
             except Exception as e:
                 try:
-                    conn.rollback()
+                    self._rollback(conn)
                 except Exception as ex:
                     exc.raise_with_traceback(
                         exc.CopyError(f"{ex}\n unable to rollback")
@@ -329,8 +633,13 @@ class Commuter(BaseCommuter):
         """
 
         _schema, _table_name = self._get_schema(table_name)
-        df = self.select(queries.is_table_exist(_table_name, _schema))
-        return bool(len(df) > 0)
+        return bool(
+            self.select_one(
+                queries.is_table_exist(),
+                values={"table_name": _table_name, "schema": _schema},
+                default=False,
+            )
+        )
 
     def is_entry_exist(self, table_name: str, **kwargs: Any) -> bool:
         """Return True if entry already exists, otherwise return False.
@@ -384,7 +693,7 @@ class Commuter(BaseCommuter):
             sql.SQL(table_name), self.make_where(list(kwargs.keys()))
         )
 
-        self._execute(cmd, values=kwargs)
+        self._execute(cmd, values=kwargs, fetch=False)
 
     @staticmethod
     def make_where(keys: List[str]) -> sql.Composed:
@@ -435,37 +744,26 @@ class Commuter(BaseCommuter):
 
         Returns:
             DataFrame without primary key conflicts.
+
+        Raises:
+            QueryExecutionError: if execution fails, e.g. if the keys
+                can't be converted to the data types of the key columns.
         """
 
-        p_key = self.select(queries.primary_key(table_name))
+        p_key = self._select_metadata(
+            ("primary_key",) + self._get_schema(table_name),
+            queries.primary_key(),
+            values={"table_name": table_name},
+        )
         p_key = p_key["column_name"].to_list()
 
-        df = data.copy()
-
         if len(p_key) > 0:
-            if where is not None:
-                if isinstance(where, str):
-                    where = sql.SQL(where)
-                cmd = sql.Composed(
-                    [
-                        sql.SQL("SELECT * FROM {} WHERE ").format(sql.SQL(table_name)),
-                        where,
-                    ]
-                )
-            else:
-                cmd = sql.SQL("SELECT * FROM {}").format(sql.SQL(table_name))
-
-            table_data = self.select(cmd)
-
-            if not table_data.empty:
-                df.set_index(p_key, inplace=True)
-                table_data.set_index(p_key, inplace=True)
-                # remove rows which are in table data index
-                df = df[~df.index.isin(table_data.index)]
-                # reset index and sort columns
-                df = df.reset_index(level=p_key)
-                df = df[data.columns]
-        return df
+            table_data = self._select_keys(
+                table_name, data[p_key].drop_duplicates(), where=where
+            )
+            # remove rows which are in table data
+            data = data[~_isin(data[p_key], table_data)]
+        return data
 
     def resolve_foreign_conflicts(
         self,
@@ -493,45 +791,33 @@ class Commuter(BaseCommuter):
 
         Returns:
             DataFrame without foreign key conflicts.
-        """
 
-        df = data.copy()
+        Raises:
+            QueryExecutionError: if execution fails, e.g. if the keys
+                can't be converted to the data types of the key columns.
+        """
 
         _schema, _table_name = self._get_schema(table_name)
         _parent_schema, _parent_name = self._get_schema(parent_name)
 
-        foreign_key = self.select(
-            queries.foreign_key(_table_name, _schema, _parent_name, _parent_schema)
+        foreign_key = self._select_metadata(
+            ("foreign_key", _schema, _table_name, _parent_schema, _parent_name),
+            queries.foreign_key(),
+            values={
+                "table_name": _table_name,
+                "schema": _schema,
+                "parent_name": _parent_name,
+                "parent_schema": _parent_schema,
+            },
         )
 
         if len(foreign_key) > 0:
-            if where is not None:
-                if isinstance(where, str):
-                    where = sql.SQL(where)
-                cmd = sql.Composed(
-                    [
-                        sql.SQL("SELECT * FROM {} WHERE ").format(sql.SQL(parent_name)),
-                        where,
-                    ]
-                )
-            else:
-                cmd = sql.SQL("SELECT * FROM {}").format(sql.SQL(parent_name))
-
-            parent_data = self.select(cmd)
-
-            if not parent_data.empty:
-                df.set_index(foreign_key["child_column"].to_list(), inplace=True)
-                parent_data.set_index(
-                    foreign_key["parent_column"].to_list(), inplace=True
-                )
-                # remove rows which are not in parent index
-                df = df[df.index.isin(parent_data.index)]
-                # reset index and sort columns
-                df = df.reset_index(level=foreign_key["child_column"].to_list())
-                df = df[data.columns]
-            else:
-                df = pd.DataFrame()
-        return df
+            keys = data[foreign_key["child_column"].to_list()].drop_duplicates()
+            keys.columns = foreign_key["parent_column"].to_list()
+            parent_data = self._select_keys(parent_name, keys, where=where)
+            # remove rows which are not in parent data
+            data = data[_isin(data[foreign_key["child_column"].to_list()], parent_data)]
+        return data
 
     def encode_category(
         self,
@@ -687,6 +973,104 @@ class Commuter(BaseCommuter):
 
         return data
 
+    def _select_keys(
+        self,
+        table_name: str,
+        keys: pd.DataFrame,
+        where: Optional[Union[str, sql.Composed]] = None,
+    ) -> pd.DataFrame:
+        """Return the keys which are present in the table.
+
+        Keys are copied to a temporary table and joined with
+        ``table_name`` on the server side, so only the matched keys
+        are transferred back instead of the whole table.
+
+        Args:
+            table_name:
+                Name of the table.
+            keys:
+                DataFrame with the keys, its columns must be named
+                as the key columns in ``table_name``.
+            where:
+                WHERE clause used to filter rows of ``table_name``.
+
+        Returns:
+            Pandas.DataFrame with the matched keys.
+
+        Raises:
+            QueryExecutionError: if execution fails.
+        """
+
+        columns = sql.SQL(", ").join(map(sql.Identifier, keys.columns))
+        cmd = sql.SQL("SELECT k.* FROM pgcom_keys k JOIN {} USING ({})").format(
+            sql.SQL(table_name), columns
+        )
+
+        if where is not None:
+            if isinstance(where, str):
+                where = sql.SQL(where)
+            cmd = sql.Composed([cmd, sql.SQL(" WHERE "), where])
+
+        fetched = []  # type: List[Any]
+        # missing keys are never matched by the join
+        keys = keys.dropna()
+
+        # integer keys with missing values are held by pandas as floats,
+        # fractional values can't match integer columns, so they are
+        # dropped, and the rest is converted to integers before copying
+        table_columns = self._table_columns(table_name)
+        data_types = dict(zip(table_columns["column_name"], table_columns["data_type"]))
+        integer_keys = [
+            column
+            for column in keys.columns
+            if keys[column].dtype.kind == "f"
+            and data_types.get(column) in _INTEGER_TYPES
+        ]
+
+        if integer_keys:
+            values = keys[integer_keys].to_numpy()
+            is_integral = np.isfinite(values) & (values == np.round(values))
+            keys = keys[is_integral.all(axis=1)]
+            keys = keys.astype({column: np.int64 for column in integer_keys})
+
+        with self._open_connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        sql.SQL(
+                            "CREATE TEMP TABLE pgcom_keys ON COMMIT DROP AS "
+                            "SELECT {} FROM {} WITH NO DATA"
+                        ).format(columns, sql.SQL(table_name))
+                    )
+                    cur.copy_expert(
+                        "COPY pgcom_keys FROM STDIN WITH (FORMAT CSV)",
+                        copy_io.ChunkedReader(
+                            copy_io.iter_csv(keys, encoding=encodings[conn.encoding])
+                        ),
+                    )
+                    cur.execute(cmd)
+                    fetched = cur.fetchall()
+                    # the temporary table outlives the command
+                    # inside of the transaction
+                    cur.execute("DROP TABLE pgcom_keys")
+                self._commit(conn)
+            except Exception as e:
+                try:
+                    self._rollback(conn)
+                except Exception as ex:
+                    exc.raise_with_traceback(
+                        exc.QueryExecutionError(
+                            f"Execution failed on sql: {cmd}\n{ex}\n "
+                            f"unable to rollback"
+                        )
+                    )
+
+                exc.raise_with_traceback(
+                    exc.QueryExecutionError(f"Execution failed on sql: {cmd}\n{e}\n")
+                )
+
+        return pd.DataFrame.from_records(fetched, columns=list(keys.columns))
+
     def _table_columns(self, table_name: str) -> pd.DataFrame:
         """Return columns attributes of the given table.
 
@@ -700,28 +1084,119 @@ class Commuter(BaseCommuter):
         """
 
         _schema, _table_name = self._get_schema(table_name)
-        return self.select(queries.column_names(_table_name, _schema))
+        return self._select_metadata(
+            ("columns", _schema, _table_name),
+            queries.column_names(),
+            values={"table_name": _table_name, "schema": _schema},
+        )
+
+    def _select_metadata(
+        self, key: Tuple[str, ...], cmd: str, values: QueryParams
+    ) -> pd.DataFrame:
+        """Read metadata query into a DataFrame using the cache.
+
+        The query is executed once per key, then the result is taken
+        from the cache. Empty results aren't cached, since the table
+        might be not created yet. The cache is shared between threads,
+        the query itself is executed without holding the lock. The result
+        isn't cached if the cache was dropped while the query was running,
+        since it might be already outdated.
+        """
+
+        with self._metadata_lock:
+            df = self._metadata_cache.get(key)
+            generation = self._metadata_generation
+
+        if df is None:
+            df = self.select(cmd, values=values)
+            if not df.empty:
+                with self._metadata_lock:
+                    if generation == self._metadata_generation:
+                        self._metadata_cache[key] = df
+        return df
 
     def _format_data(
         self, data: pd.DataFrame, table_name: str, sep: str = ","
     ) -> pd.DataFrame:
-        """Formatting DataFrame before applying COPY FROM."""
+        """Formatting DataFrame before applying COPY FROM.
+
+        Returns a new DataFrame, only the converted columns are
+        copied, the input DataFrame is left unchanged.
+        """
 
         table_columns = self._table_columns(table_name)
-        columns = []  # type: List[str]
-
-        for row in table_columns.itertuples():
-            column = row.column_name
-
-            if column in data.columns:
-                columns += [column]
-
-                if row.data_type in ["smallint", "integer", "bigint"]:
-                    if data[column].dtype == np.float64:
-                        data[column] = data[column].round().astype("Int64")
-                elif row.data_type in ["text"]:
-                    try:
-                        data[column] = data[column].str.replace(sep, "")
-                    except AttributeError:
-                        continue
-        return data[columns]
+        data_types = dict(zip(table_columns["column_name"], table_columns["data_type"]))
+        columns = [column for column in data_types if column in data.columns]
+        formatted = {}  # type: Dict[str, pd.Series]
+
+        for column in columns:
+            if data_types[column] in _INTEGER_TYPES:
+                if data[column].dtype.kind == "f":
+                    formatted[column] = data[column].round().astype("Int64")
+            elif data_types[column] in _TEXT_TYPES:
+                # columns mixing strings with other objects are left as is,
+                # since str accessor replaces non-string values with NaN
+                if pd.api.types.infer_dtype(data[column], skipna=True) == "string":
+                    formatted[column] = data[column].str.replace(sep, "", regex=False)
+        return data[columns].assign(**formatted)
+
+
+def _iter_rows(data: pd.DataFrame, chunksize: int = 10000) -> Iterator[List[Any]]:
+    """Generate rows of DataFrame with missing values replaced by None.
+
+    Rows are converted to Python objects by chunks, so the whole
+    DataFrame is never held in memory as a list of rows.
+    """
+
+    for start in range(0, len(data), chunksize):
+        chunk = data.iloc[start : start + chunksize]
+        yield from chunk.to_numpy(dtype=object, na_value=None).tolist()
+
+
+def _isin(values: pd.DataFrame, keys: pd.DataFrame) -> np.ndarray:
+    """Return boolean mask showing whether each row of values is in keys.
+
+    Columns of values and keys are matched by position.
+    """
+
+    if values.shape[1] == 1:
+        return values.iloc[:, 0].isin(keys.iloc[:, 0]).to_numpy()
+    return pd.MultiIndex.from_frame(values).isin(pd.MultiIndex.from_frame(keys))
+
+
+@lru_cache(maxsize=256)
+def _insert_cmd(
+    table_name: str,
+    columns: Tuple[str, ...],
+    placeholders: Optional[Tuple[str, ...]] = None,
+) -> sql.Composed:
+    """Return INSERT INTO command for the given table and columns."""
+
+    return sql.SQL("INSERT INTO {} ({}) VALUES {}").format(
+        sql.SQL(table_name),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        _values_template(len(columns), placeholders),
+    )
+
+
+@lru_cache(maxsize=256)
+def _insert_values_cmd(table_name: str, columns: Tuple[str, ...]) -> sql.Composed:
+    """Return INSERT INTO command with a placeholder for VALUES list."""
+
+    return sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+        sql.SQL(table_name), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+
+
+@lru_cache(maxsize=256)
+def _values_template(
+    n_columns: int, placeholders: Optional[Tuple[str, ...]] = None
+) -> sql.Composed:
+    """Return template of a row in VALUES list."""
+
+    if placeholders is None:
+        values = sql.Placeholder() * n_columns
+    else:
+        values = sql.Composed([sql.SQL(p) for p in placeholders])
+
+    return sql.SQL("({})").format(sql.SQL(", ").join(values))
@@ -1,17 +1,17 @@
 __all__ = ["Connector"]
 
-from contextlib import contextmanager
 import random
+import threading
 import time
-from typing import Any, Iterator, Mapping, Sequence, Union
+from typing import Any, Dict, Optional
+import weakref
 
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extensions import connection
 
 from .base import BaseConnector
 
-QueryParams = Union[Sequence[Any], Mapping[str, Any]]
-
 
 class Connector(BaseConnector):
     """Setting a connection with database.
@@ -21,6 +21,9 @@ class Connector(BaseConnector):
     `psycopg2.connect <https://www.psycopg.org/docs/module.html>`_
     can be passed as a keyword.
 
+    Connector can be shared between threads. If all the ``pool_size``
+    connections are in use, then the thread waits for a free one.
+
     Args:
         pool_size:
             The maximum amount of connections the pool will support.
@@ -32,14 +35,14 @@ class Connector(BaseConnector):
             The maximum amount of reconnects, defaults to 3.
     """
 
-    _pool: pool.SimpleConnectionPool
+    _pool: pool.ThreadedConnectionPool
 
     def __init__(
         self,
         pool_size: int = 20,
         pre_ping: bool = False,
         max_reconnects: int = 3,
-        **kwargs: str
+        **kwargs: Any
     ) -> None:
         super().__init__(**kwargs)
 
@@ -47,61 +50,126 @@ class Connector(BaseConnector):
         self.pre_ping = pre_ping
         self.max_reconnects = max_reconnects
 
+        self._finalizer: Optional[weakref.finalize] = None
         self._pool = self.make_pool()
 
-    @contextmanager
-    def open_connection(self) -> Iterator[psycopg2.connect]:
+        # guards restarting the pool and returning connections to it
+        self._lock = threading.Lock()
+        # limits the amount of connections in use to the pool size
+        self._semaphore = threading.BoundedSemaphore(pool_size)
+        # pools the connections in use were taken from
+        self._owners: Dict[int, pool.ThreadedConnectionPool] = {}
+
+    def open_connection(self) -> "_PooledConnection":
         """Generate a free connection from the pool.
 
         If ``pre_ping`` is True, then the connection is tested
         whether its alive or not. If not, then reconnect.
         """
 
-        conn = self._pool.getconn()
+        return _PooledConnection(self)
+
+    def acquire(self) -> connection:
+        """Get a free connection from the pool.
+
+        The connection must be returned to the pool with
+        :func:`~pgcom.connector.Connector.release` when it's no longer needed.
+        Blocks until a connection is free if all of them are in use.
+        """
+
+        self._semaphore.acquire()
+
+        try:
+            conn_pool = self._pool
+            conn = conn_pool.getconn()
+
+            if self.pre_ping:
+                for n in range(self.max_reconnects):
+                    if not self.ping(conn):
+                        if n > 0:
+                            time.sleep(self._back_off_time(n - 1))
+                        conn_pool = self._restart_pool(conn_pool)
+                        conn = conn_pool.getconn()
+                    else:
+                        break
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        with self._lock:
+            self._owners[id(conn)] = conn_pool
+        return conn
+
+    def release(self, conn: connection) -> None:
+        """Return the connection to the pool.
+
+        Connections are kept in the pool in transactional mode,
+        autocommit is switched off before the connection is returned.
+        The connection is returned to the pool it was taken from,
+        if that pool has been restarted meanwhile, then the connection
+        is closed.
+        """
 
-        if self.pre_ping:
-            for n in range(self.max_reconnects):
-                if not self.ping(conn):
-                    if n > 0:
-                        time.sleep(self._back_off_time(n - 1))
-                    self._pool = self.restart_pool()
-                    conn = self._pool.getconn()
-                else:
-                    break
         try:
-            yield conn
+            if not conn.closed and conn.autocommit:
+                conn.autocommit = False
+
+            with self._lock:
+                conn_pool = self._owners.pop(id(conn), self._pool)
+                if conn_pool.closed:
+                    conn.close()
+                else:
+                    conn_pool.putconn(conn)
         finally:
-            self._pool.putconn(conn)
+            self._semaphore.release()
 
-    def restart_pool(self) -> pool.SimpleConnectionPool:
+    def restart_pool(self) -> pool.ThreadedConnectionPool:
         """Close all the connections and create a new pool."""
 
         self.close_all()
         return self.make_pool()
 
+    def _restart_pool(
+        self, failed_pool: pool.ThreadedConnectionPool
+    ) -> pool.ThreadedConnectionPool:
+        """Restart the pool, unless another thread has done it already."""
+
+        with self._lock:
+            if self._pool is failed_pool:
+                self._pool = self.restart_pool()
+            return self._pool
+
     def close_all(self) -> None:
         """Close all the connections handled by the pool."""
 
-        if not self._pool.closed:
-            self._pool.closeall()
+        _close_pool(self._pool)
 
-    def make_pool(self) -> pool.SimpleConnectionPool:
+    def make_pool(self) -> pool.ThreadedConnectionPool:
         """Create a connection pool.
 
-        A connection pool that can't be shared
-        across different threads.
+        A connection pool that can be safely shared
+        across different threads. The pool is closed when
+        connector is garbage collected or at interpreter exit.
         """
 
-        return pool.SimpleConnectionPool(
-            minconn=1, maxconn=self.pool_size, **self._kwargs
+        _pool = pool.ThreadedConnectionPool(
+            minconn=1, maxconn=self.pool_size, dsn=self._dsn, **self._connect_kwargs
         )
 
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._finalizer = weakref.finalize(self, _close_pool, _pool)
+
+        return _pool
+
     @staticmethod
-    def ping(conn: psycopg2.connect) -> bool:
+    def ping(conn: connection) -> bool:
         """Ping the connection for liveness.
 
         Implements a ping ("SELECT 1") on the connection.
         Return True if the connection is alive, otherwise False.
+        The transaction opened by the ping is rolled back, so the
+        connection is returned idle.
 
         Args:
             conn:
@@ -109,16 +177,44 @@ class Connector(BaseConnector):
         """
 
         is_alive = False
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1")
-            if cur.description is not None:
-                fetched = cur.fetchall()
-                try:
-                    is_alive = fetched[0][0] == 1
-                except IndexError:
-                    pass
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                if cur.description is not None:
+                    fetched = cur.fetchall()
+                    try:
+                        is_alive = fetched[0][0] == 1
+                    except IndexError:
+                        pass
+            conn.rollback()
+        except psycopg2.Error:
+            # connection is closed or broken
+            return False
         return is_alive
 
     @staticmethod
     def _back_off_time(n: int) -> int:
         return (2 ** n) + (random.randint(0, 1000) / 1000)
+
+
+class _PooledConnection:
+    """Context manager returning a connection to the pool on exit."""
+
+    __slots__ = ("_connector", "_conn")
+
+    def __init__(self, connector: Connector) -> None:
+        self._connector = connector
+
+    def __enter__(self) -> connection:
+        self._conn = self._connector.acquire()
+        return self._conn
+
+    def __exit__(self, *args: Any) -> None:
+        self._connector.release(self._conn)
+
+
+def _close_pool(conn_pool: pool.AbstractConnectionPool) -> None:
+    """Close all the connections handled by the pool."""
+
+    if not conn_pool.closed:
+        conn_pool.closeall()
@@ -0,0 +1,290 @@
+__all__ = ["ChunkedReader", "binary_encoders", "iter_binary", "iter_csv"]
+
+from io import RawIOBase
+from itertools import chain, repeat
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+import struct
+
+import numpy as np
+import pandas as pd
+
+Encoder = Callable[[pd.Series], List[bytes]]
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+_NULL = struct.pack(">i", -1)
+_PG_EPOCH = np.datetime64("2000-01-01", "us")
+_PG_EPOCH_DATE = np.datetime64("2000-01-01", "D")
+_pack_size = struct.Struct(">i").pack
+
+_INTEGERS = {"smallint": ">i2", "integer": ">i4", "bigint": ">i8"}
+_FLOATS = {"real": ">f4", "double precision": ">f8"}
+_TIMESTAMPS = {"timestamp without time zone": False, "timestamp with time zone": True}
+_TEXTS = ["text", "character varying", "character"]
+
+
+class ChunkedReader(RawIOBase):
+    """File-like object reading bytes from an iterator of chunks.
+
+    Chunks are produced lazily while the reader is consumed, so it can be
+    passed as the source to COPY FROM command without building the whole
+    buffer in memory.
+
+    Args:
+        chunks:
+            Iterable of bytes.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b"")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while self._pos >= len(self._chunk):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk, self._pos = memoryview(chunk), 0
+
+        n = min(len(b), len(self._chunk) - self._pos)
+        b[:n] = self._chunk[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+
+def binary_encoders(
+    data: pd.DataFrame, data_types: Sequence[Optional[str]], encoding: str
+) -> Optional[List[Encoder]]:
+    """Return encoders of DataFrame columns to PostgreSQL binary format.
+
+    Args:
+        data:
+            Pandas.DataFrame to be encoded.
+        data_types:
+            Data types of the table columns the DataFrame
+            columns are written to, as given by information_schema.
+        encoding:
+            Python name of the connection encoding.
+
+    Returns:
+        List of column encoders or None, if at least one of the
+        columns can't be represented in binary format.
+    """
+
+    encoders = []
+
+    for i, data_type in enumerate(data_types):
+        encoder = None
+        if data_type is not None:
+            encoder = _make_encoder(data.iloc[:, i], data_type, encoding)
+        if encoder is None:
+            return None
+        encoders += [encoder]
+    return encoders
+
+
+def iter_binary(
+    data: pd.DataFrame, encoders: List[Encoder], chunksize: int = 10000
+) -> Iterable[bytes]:
+    """Generate PostgreSQL binary COPY stream from a DataFrame.
+
+    Args:
+        data:
+            Pandas.DataFrame to be encoded.
+        encoders:
+            List of column encoders returned by :func:`binary_encoders`.
+        chunksize:
+            Number of rows encoded at a time.
+
+    Yields:
+        Chunks of the binary COPY stream.
+    """
+
+    yield COPY_SIGNATURE
+
+    row_header = struct.pack(">h", len(encoders))
+    fixed = [encoder for encoder in encoders if isinstance(encoder, _FixedEncoder)]
+
+    for start in range(0, len(data), chunksize):
+        chunk = data.iloc[start : start + chunksize]
+
+        if len(fixed) == len(encoders) and not chunk.isna().to_numpy().any():
+            yield _pack_rows(chunk, fixed)
+            continue
+
+        fields = [encode(chunk.iloc[:, i]) for i, encode in enumerate(encoders)]
+        yield b"".join(chain.from_iterable(zip(repeat(row_header), *fields)))
+
+    yield COPY_TRAILER
+
+
+def iter_csv(
+    data: pd.DataFrame,
+    sep: str = ",",
+    na_value: str = "",
+    encoding: str = "utf_8",
+    chunksize: int = 10000,
+) -> Iterable[bytes]:
+    """Generate CSV stream from a DataFrame.
+
+    Args:
+        data:
+            Pandas.DataFrame to be encoded.
+        sep:
+            Field delimiter.
+        na_value:
+            Missing data representation.
+        encoding:
+            Python name of the connection encoding.
+        chunksize:
+            Number of rows encoded at a time.
+
+    Yields:
+        Chunks of the CSV stream.
+    """
+
+    for start in range(0, len(data), chunksize):
+        chunk = data.iloc[start : start + chunksize].to_csv(
+            sep=sep, na_rep=na_value, index=False, header=False
+        )
+        yield chunk.encode(encoding)
+
+
+def _make_encoder(
+    series: pd.Series, data_type: str, encoding: str
+) -> Optional[Encoder]:
+    """Return encoder of the column or None if it isn't supported."""
+
+    kind = series.dtype.kind
+    tz = getattr(series.dtype, "tz", None)
+
+    if data_type in _INTEGERS:
+        fmt = _INTEGERS[data_type]
+        if kind == "f":
+            values = series.dropna().to_numpy(dtype=np.float64)
+            if not np.array_equal(values, np.round(values)):
+                return None
+        elif kind not in "iu":
+            return None
+        limits = np.iinfo(fmt)
+        if series.notna().any() and (
+            series.min() < limits.min or series.max() > limits.max
+        ):
+            return None
+        dtype = np.float64 if kind == "f" else np.int64
+        return _FixedEncoder(fmt, lambda s: s.to_numpy(dtype=dtype, na_value=0))
+    elif data_type in _FLOATS:
+        if kind not in "iuf":
+            return None
+        return _FixedEncoder(
+            _FLOATS[data_type], lambda s: s.to_numpy(dtype=np.float64, na_value=0)
+        )
+    elif data_type == "boolean":
+        if kind != "b":
+            return None
+        return _FixedEncoder("?", lambda s: s.to_numpy(dtype=bool, na_value=False))
+    elif data_type in _TIMESTAMPS:
+        if kind != "M" or (tz is not None) != _TIMESTAMPS[data_type]:
+            return None
+        return _FixedEncoder(">i8", _timestamp_converter(tz is not None))
+    elif data_type == "date":
+        if kind != "M" or tz is not None:
+            return None
+        return _FixedEncoder(">i4", _date_converter)
+    elif data_type in _TEXTS:
+        if kind != "O":
+            return None
+        return _text_encoder(encoding)
+    return None
+
+
+class _FixedEncoder:
+    """Encoder of the fixed-width values.
+
+    Args:
+        fmt:
+            Big-endian numpy type of the binary representation.
+        convert:
+            Function converting the column to numpy array.
+    """
+
+    __slots__ = ("fmt", "convert", "_dtype")
+
+    def __init__(self, fmt: str, convert: Callable[[pd.Series], np.ndarray]) -> None:
+        self.fmt = fmt
+        self.convert = convert
+        self._dtype = np.dtype([("size", ">i4"), ("value", fmt)])
+
+    def __call__(self, series: pd.Series) -> List[bytes]:
+        packed = np.empty(len(series), dtype=self._dtype)
+        packed["size"] = self._dtype["value"].itemsize
+        packed["value"] = self.convert(series)
+
+        raw = packed.tobytes()
+        width = self._dtype.itemsize
+        fields = [raw[i : i + width] for i in range(0, len(raw), width)]
+        for i in np.flatnonzero(series.isna().to_numpy()):
+            fields[i] = _NULL
+        return fields
+
+
+def _pack_rows(data: pd.DataFrame, encoders: List["_FixedEncoder"]) -> bytes:
+    """Encode rows without null values into a single buffer.
+
+    Rows are laid out as a numpy structured array, so all the values
+    of a column are written at once.
+    """
+
+    fields: List[Tuple[str, str]] = [("n_columns", ">i2")]
+    for i, encoder in enumerate(encoders):
+        fields += [(f"size_{i}", ">i4"), (f"value_{i}", encoder.fmt)]
+
+    rows = np.empty(len(data), dtype=np.dtype(fields))
+    rows["n_columns"] = len(encoders)
+
+    for i, encoder in enumerate(encoders):
+        rows[f"size_{i}"] = np.dtype(encoder.fmt).itemsize
+        rows[f"value_{i}"] = encoder.convert(data.iloc[:, i])
+
+    return rows.tobytes()
+
+
+def _timestamp_converter(to_utc: bool) -> Callable[[pd.Series], np.ndarray]:
+    """Return function converting timestamps to microseconds since 2000-01-01."""
+
+    def convert(series: pd.Series) -> np.ndarray:
+        if to_utc:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        values = series.dt.round("us").to_numpy(dtype="datetime64[us]")
+        return (values - _PG_EPOCH).astype(np.int64)
+
+    return convert
+
+
+def _date_converter(series: pd.Series) -> np.ndarray:
+    """Convert dates to days since 2000-01-01."""
+
+    values = series.to_numpy().astype("datetime64[D]")
+    return (values - _PG_EPOCH_DATE).astype(np.int64)
+
+
+def _text_encoder(encoding: str) -> Encoder:
+    """Return encoder of the text values."""
+
+    def encode(series: pd.Series) -> List[bytes]:
+        fields = []
+        for value, is_null in zip(series.tolist(), series.isna().tolist()):
+            if is_null:
+                fields += [_NULL]
+            else:
+                encoded = str(value).encode(encoding)
+                fields += [_pack_size(len(encoded)) + encoded]
+        return fields
+
+    return encode
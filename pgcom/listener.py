@@ -49,7 +49,7 @@ class Listener(BaseCommuter):
         pool_size: int = 20,
         pre_ping: bool = False,
         max_reconnects: int = 3,
-        **kwargs: str,
+        **kwargs: Any,
     ) -> None:
         super().__init__(Connector(pool_size, pre_ping, max_reconnects, **kwargs))
 
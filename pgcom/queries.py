@@ -1,10 +1,13 @@
 __all__ = ["primary_key", "foreign_key", "is_table_exist", "column_names"]
 
 
-def primary_key(table_name: str) -> str:
-    """Return column names of the primary key."""
+def primary_key() -> str:
+    """Return column names of the primary key.
 
-    return f"""
+    Query parameters: ``table_name``.
+    """
+
+    return """
     SELECT
         a.attname AS column_name,
         format_type(a.atttypid, a.atttypmod) AS data_type
@@ -16,17 +19,19 @@ def primary_key(table_name: str) -> str:
         a.attrelid = i.indrelid AND
         a.attnum = ANY(i.indkey)
     WHERE
-        i.indrelid = '{table_name}'::regclass AND
+        i.indrelid = %(table_name)s::regclass AND
         i.indisprimary
     """
 
 
-def foreign_key(
-    table_name: str, schema: str, parent_name: str, parent_schema: str
-) -> str:
-    """Return column names (child and parent) of the foreign key."""
+def foreign_key() -> str:
+    """Return column names (child and parent) of the foreign key.
+
+    Query parameters: ``table_name``, ``schema``,
+    ``parent_name``, ``parent_schema``.
+    """
 
-    return f"""
+    return """
     SELECT
         att2.attname as child_column,
         att.attname as parent_column
@@ -45,10 +50,10 @@ def foreign_key(
             JOIN pg_class cl2 on cl2.oid = con1.confrelid
             JOIN pg_namespace ns2 on ns2.oid = cl2.relnamespace
         WHERE
-            cl.relname = '{table_name}' AND
-            ns.nspname = '{schema}' AND
-            cl2.relname = '{parent_name}' AND
-            ns2.nspname = '{parent_schema}' AND
+            cl.relname = %(table_name)s AND
+            ns.nspname = %(schema)s AND
+            cl2.relname = %(parent_name)s AND
+            ns2.nspname = %(parent_schema)s AND
             con1.contype = 'f'
        ) con
        JOIN pg_attribute att ON
@@ -60,32 +65,39 @@ def foreign_key(
     """
 
 
-def is_table_exist(table_name: str, schema: str) -> str:
-    """Return table name if it exists in database."""
+def is_table_exist() -> str:
+    """Return True if table exists in database, otherwise False.
 
-    return f"""
-    SELECT
-        table_name
-    FROM
-        information_schema.tables
-    WHERE
-        table_name = '{table_name}' AND
-        table_schema='{schema}'
-    LIMIT 1
+    Query parameters: ``table_name``, ``schema``.
     """
 
+    return """
+    SELECT EXISTS (
+        SELECT
+            1
+        FROM
+            information_schema.tables
+        WHERE
+            table_name = %(table_name)s AND
+            table_schema = %(schema)s
+    )
+    """
 
-def column_names(table_name: str, schema: str) -> str:
-    """Return column names of the given table."""
 
-    return f"""
+def column_names() -> str:
+    """Return column names of the given table.
+
+    Query parameters: ``table_name``, ``schema``.
+    """
+
+    return """
     SELECT
         column_name, data_type
     FROM
         information_schema.columns
     WHERE
-        table_schema = '{schema}' AND
-        table_name = '{table_name}'
+        table_schema = %(schema)s AND
+        table_name = %(table_name)s
     ORDER BY
         ordinal_position;
     """
@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from unittest.mock import mock_open, patch
+import weakref
 
 import numpy as np
 import pandas as pd
@@ -86,6 +88,19 @@ def test_repr():
     assert repr(commuter)[-1] == ")"
 
 
+def test_get_schema():
+    assert commuter._get_schema("t") == ("public", "t")
+    assert commuter._get_schema("model.t") == ("model", "t")
+    assert commuter._get_schema("db.model.t") == ("public", "db.model.t")
+
+
+def test_instance_attributes():
+    assert weakref.ref(commuter)() is commuter
+    with patch.object(commuter, "select_one", return_value=5):
+        assert commuter.get_connections_count() == 5
+    assert commuter.get_connections_count() > 0
+
+
 @with_table("test_table", create_test_table)
 def test_execute():
     assert commuter.is_table_exist("test_table")
@@ -94,6 +109,42 @@ def test_execute():
     assert e.type == exc.QueryExecutionError
 
 
+def test_execute_autocommit():
+    commuter.execute("VACUUM")
+    with commuter.connector.open_connection() as conn:
+        assert not conn.autocommit
+
+
+@with_table("test_table", create_test_table)
+def test_execute_many():
+    cmd = "INSERT INTO test_table (var_2, var_3) VALUES (%s, %s)"
+    cmds = [(cmd, (i, "x")) for i in range(5)]
+    cmds += [("DELETE FROM test_table WHERE var_2 = %s", (0,))]
+    commuter.execute_many(cmds, page_size=2)
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 4
+
+    cmds = [(cmd + " -- comment", (10, "x")), (cmd, (11, "x"))]
+    commuter.execute_many(cmds)
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 6
+    commuter.execute("DELETE FROM test_table WHERE var_2 > 9")
+
+    with pytest.raises(exc.QueryExecutionError) as e:
+        commuter.execute_many([(cmd, (5, "x")), ("SELECT 1 FROM fake_table", None)])
+    assert e.type == exc.QueryExecutionError
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 4
+
+    with pytest.raises(exc.QueryExecutionError) as e:
+        commuter.execute_many([(cmd, (6, "x")), (cmd, (7,))], page_size=1)
+    assert "(7," not in str(e.value)
+    assert "%s, %s" in str(e.value)
+
+    with pytest.raises(exc.QueryExecutionError) as e:
+        commuter.execute_many(
+            [(cmd, (6, "x")), ("SELECT 1 FROM fake_table", None)], page_size=1
+        )
+    assert "fake_table" in str(e.value)
+
+
 @with_table("test_table", create_test_table)
 def test_execute_script():
     assert commuter.is_table_exist("test_table")
@@ -121,12 +172,67 @@ def test_multiple_select():
     assert commuter.get_connections_count() - n_conn < 10
 
 
+@with_table("test_table", create_test_table)
+def test_iter_execute():
+    commuter.insert("test_table", create_test_data())
+    chunks = list(commuter._iter_execute("SELECT * FROM test_table", itersize=2))
+    assert [len(rows) for rows, _ in chunks] == [2, 1]
+    assert chunks[0][1] == ["var_1", "var_2", "var_3", "var_4", "var_5"]
+
+    for rows, _ in commuter._iter_execute("SELECT * FROM test_table", itersize=1):
+        break
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 3
+
+    with pytest.raises(exc.QueryExecutionError) as e:
+        list(commuter._iter_execute("SELECT 1 FROM fake_table"))
+    assert e.type == exc.QueryExecutionError
+
+
 def test_insert():
     with pytest.raises(exc.QueryExecutionError) as e:
         commuter.insert("fake_table", create_test_data())
     assert e.type == exc.QueryExecutionError
 
 
+@with_table("test_table", create_test_table)
+def test_insert_copy():
+    commuter.insert("test_table", create_test_data(), method="copy")
+    df = commuter.select("SELECT * FROM test_table")
+    assert df["var_2"].to_list() == [1, 2, 3]
+
+    with pytest.raises(ValueError):
+        commuter.insert("test_table", create_test_data(), method="fake")
+
+
+@with_table("test_table", create_test_table)
+def test_insert_page_size():
+    commuter.insert("test_table", create_test_data(), page_size=2)
+    df = commuter.select("SELECT * FROM test_table")
+    assert df["var_2"].to_list() == [1, 2, 3]
+
+
+@with_table("test_table", create_test_table)
+def test_insert_auto():
+    data = pd.DataFrame({"var_2": range(1000), "var_3": "x"})
+    commuter.insert("test_table", data, method="auto")
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 1000
+
+    with pytest.raises(exc.CopyError):
+        commuter.insert("fake_table", data, method="auto")
+
+
+@pytest.mark.parametrize("n_rows", [999, 1000])
+@with_table("test_table", create_test_table)
+def test_insert_empty_strings(n_rows):
+    data = pd.DataFrame({"var_2": range(n_rows), "var_3": ""})
+    commuter.insert("test_table", data)
+    cmd = "SELECT COUNT(*) FROM test_table WHERE var_3 = ''"
+    assert commuter.select_one(cmd) == n_rows
+
+    with pytest.raises(exc.QueryExecutionError):
+        commuter.insert("fake_table", data)
+
+
 @with_table("test_table", create_test_table)
 def test_select_one():
     cmd = "SELECT MAX(var_2) FROM test_table"
@@ -209,6 +315,7 @@ def test_format_text_columns():
     df = create_test_data()
     df["var_3"] = ["abc", "abc.abc", "abc,abc"]
     commuter.copy_from("test_table", df, format_data=True)
+    assert df["var_3"].to_list()[-1] == "abc,abc"
     df = commuter.select("SELECT * FROM test_table")
     assert df["var_3"].to_list() == ["abc", "abc.abc", "abcabc"]
 
@@ -218,6 +325,12 @@ def test_format_text_columns():
     df = commuter.select("SELECT * FROM test_table")
     assert df["var_3"].to_list() == [None, None, None]
 
+    commuter.execute("DELETE FROM test_table WHERE 1=1")
+    df["var_3"] = ["a,b", 1, None]
+    commuter.copy_from("test_table", df, format_data=True)
+    df = commuter.select("SELECT * FROM test_table ORDER BY var_2")
+    assert df["var_3"].to_list()[:2] == ["a,b", "1"]
+
 
 def test_execute_with_params():
     delete_table(table_name="people")
@@ -274,6 +387,26 @@ def test_resolve_foreign_conflicts():
     assert len(df) == 2
 
 
+@with_table("model.test_table", create_test_table)
+@with_table("child_table", create_child_table, "model.test_table")
+def test_resolve_foreign_conflicts_nullable_key():
+    commuter.copy_from("model.test_table", create_test_data())
+    child_data = pd.DataFrame({"var_1": [1, np.nan, 3, 4], "var_2": [1] * 4})
+
+    df = commuter.resolve_foreign_conflicts(
+        table_name="child_table", parent_name="model.test_table", data=child_data
+    )
+    assert df["var_1"].to_list() == [1, 3]
+
+    data = pd.DataFrame({"var_2": [1.0, np.nan, 5.0]})
+    df = commuter.resolve_primary_conflicts("model.test_table", data)
+    assert df.index.to_list() == [1, 2]
+
+    data = pd.DataFrame({"var_2": [1.5, 1.0, np.inf, 4.0]})
+    df = commuter.resolve_primary_conflicts("model.test_table", data)
+    assert df.index.to_list() == [0, 2, 3]
+
+
 @with_table("model.test_table", create_test_table)
 def test_insert_row():
     commuter.insert_row(
@@ -489,6 +622,14 @@ def test_copy_with_custom_sep():
     assert df["var_3"].to_list() == ["x", "xx", "x;x,x"]
 
 
+@with_table("model.test_table", create_test_table)
+def test_insert_integer_columns():
+    data = create_test_data()
+    commuter.insert("model.test_table", data, columns=["var_2", "var_5"])
+    df = commuter.select("select * from model.test_table")
+    assert df["var_5"].to_list() == [1, 2, 3]
+
+
 @with_table("model.test_table", create_test_table)
 def test_insert_missing():
     data = create_test_data()
@@ -496,3 +637,259 @@ def test_insert_missing():
     commuter.insert("model.test_table", data)
     df = commuter.select("select * from model.test_table")
     assert df["var_5"].isnull().sum() == 1
+
+
+def create_binary_table(table_name):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        var_1 timestamp,
+        var_2 bigint,
+        var_3 varchar(10),
+        var_4 double precision,
+        var_5 smallint,
+        var_6 boolean,
+        var_7 date,
+        var_8 timestamptz);
+    """
+
+
+@with_table("model.test_table", create_binary_table)
+def test_copy_from_binary():
+    data = pd.DataFrame(
+        {
+            "var_1": pd.to_datetime(
+                ["1999-12-31 23:59:59.123456", None, "2020-01-01 00:00:00.5"]
+            ),
+            "var_2": [2**40, -1, 0],
+            "var_3": ["x", None, "y,\n\\"],
+            "var_4": [1.5, np.nan, -2.25],
+            "var_5": [1.0, np.nan, 3.0],
+            "var_6": [True, False, True],
+            "var_7": pd.to_datetime(["1969-07-20", "2000-01-01", None]),
+            "var_8": pd.to_datetime(["2020-01-01 12:00"] * 3).tz_localize("Etc/GMT-3"),
+        }
+    )
+    commuter.copy_from("model.test_table", data, binary=True)
+    df = commuter.select("SELECT * FROM model.test_table")
+
+    assert df["var_1"].to_list()[0] == pd.Timestamp("1999-12-31 23:59:59.123456")
+    assert df["var_1"].isnull().sum() == 1
+    assert df["var_2"].to_list() == [2**40, -1, 0]
+    assert df["var_3"].to_list()[::2] == ["x", "y,\n\\"]
+    assert df["var_3"].isnull().sum() == 1
+    assert df["var_4"].isnull().sum() == 1
+    assert df["var_5"].to_list()[2] == 3
+    assert df["var_6"].to_list() == [True, False, True]
+    assert str(df["var_7"][0]) == "1969-07-20"
+    assert df["var_8"][0] == pd.Timestamp("2020-01-01 09:00", tz="UTC")
+
+    # fractional values are written in text format and rejected by server
+    data["var_5"] = [1.5, 2.0, 3.0]
+    with pytest.raises(exc.CopyError):
+        commuter.copy_from("model.test_table", data, binary=True)
+    assert commuter.select_one("SELECT COUNT(*) FROM model.test_table") == 3
+
+
+@with_table("test_table", create_test_table)
+def test_copy_from_quoted_values():
+    data = create_test_data()
+    data["var_3"] = ['x,"x"', "x\nx", "x\\x"]
+    commuter.copy_from("test_table", data)
+    df = commuter.select("SELECT * FROM test_table")
+    assert df["var_3"].to_list() == ['x,"x"', "x\nx", "x\\x"]
+
+
+def create_composite_key_table(table_name):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        var_1 integer,
+        var_2 text,
+        var_3 real,
+        PRIMARY KEY (var_1, var_2));
+    """
+
+
+@with_table("test_table", create_composite_key_table)
+def test_resolve_composite_primary_conflicts():
+    data = pd.DataFrame({"var_1": [1, 1, 2], "var_2": ["x", "y", "x"], "var_3": 0.5})
+    commuter.insert("test_table", data.iloc[:2])
+    df = commuter.resolve_primary_conflicts("test_table", data)
+    assert df.index.to_list() == [2]
+    assert df.to_dict("records") == [{"var_1": 2, "var_2": "x", "var_3": 0.5}]
+
+
+@with_table("test_table", create_test_table)
+def test_columns_cache():
+    data = create_test_data()
+    commuter.copy_from("test_table", data, format_data=True)
+    assert ("columns", "public", "test_table") in commuter._metadata_cache
+
+    commuter.execute("ALTER TABLE test_table ADD COLUMN var_6 integer")
+    assert len(commuter._metadata_cache) == 0
+
+    data["var_2"] = [4, 5, 6]
+    data["var_6"] = 6
+    commuter.copy_from("test_table", data, format_data=True)
+    assert commuter.select_one("SELECT SUM(var_6) FROM test_table") == 18
+
+    commuter.refresh_metadata()
+    assert len(commuter._metadata_cache) == 0
+
+
+@with_table("test_table", create_test_table)
+def test_columns_cache_threads():
+    def _copy_from(i):
+        data = create_test_data()
+        data["var_2"] = [3 * i, 3 * i + 1, 3 * i + 2]
+        commuter.copy_from("test_table", data, format_data=True)
+        commuter.refresh_metadata("test_table")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_copy_from, range(20)))
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 60
+
+
+@with_table("test_table", create_test_table)
+def test_columns_cache_refreshed_while_querying():
+    select = commuter.select
+
+    def _select(*args, **kwargs):
+        df = select(*args, **kwargs)
+        commuter.refresh_metadata()
+        return df
+
+    with patch.object(commuter, "select", new=_select):
+        assert not commuter._table_columns("test_table").empty
+    assert len(commuter._metadata_cache) == 0
+
+    commuter._table_columns("test_table")
+    assert len(commuter._metadata_cache) == 1
+
+
+@with_table("test_table", create_test_table)
+def test_select_iter():
+    commuter.insert("test_table", create_test_data())
+    chunks = list(commuter.select_iter("SELECT * FROM test_table", chunksize=2))
+    assert [len(df) for df in chunks] == [2, 1]
+    assert pd.concat(chunks)["var_2"].to_list() == [1, 2, 3]
+
+    cmd = "SELECT * FROM test_table WHERE var_2 > %s"
+    assert len(list(commuter.select_iter(cmd, (5,)))) == 0
+
+
+def test_table_exist_quoted_name():
+    assert not commuter.is_table_exist("model.x' OR '1'='1")
+
+
+@with_table("test_table", create_binary_table)
+def test_copy_from_binary_fixed_width():
+    data = pd.DataFrame(
+        {
+            "var_2": np.arange(5),
+            "var_4": np.linspace(0, 1, 5),
+            "var_6": [True, False] * 2 + [True],
+            "var_7": pd.date_range("2020-02-28", periods=5),
+        }
+    )
+    commuter.copy_from("test_table", data, binary=True)
+    df = commuter.select("SELECT var_2, var_4, var_6, var_7 FROM test_table")
+    assert df["var_2"].to_list() == list(range(5))
+    assert df["var_4"].to_list() == [0, 0.25, 0.5, 0.75, 1]
+    assert df["var_6"].sum() == 3
+    assert str(df["var_7"][2]) == "2020-03-01"
+
+
+@with_table("test_table", create_test_table_serial)
+def test_insert_rows():
+    rows = [{"var_2": i, "var_3": "x"} for i in range(5)]
+    assert commuter.insert_rows("test_table", rows, page_size=2) is None
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 5
+
+    ids = commuter.insert_rows("test_table", rows, return_id="id", page_size=2)
+    assert ids == [6, 7, 8, 9, 10]
+    assert commuter.insert_rows("test_table", [], return_id="id") == []
+
+
+@with_table("test_table", create_test_table)
+def test_copy_from_truncate():
+    data = create_test_data()
+    commuter.copy_from("test_table", data)
+    commuter.copy_from("test_table", data, truncate=True)
+    commuter.copy_from("test_table", data.iloc[:1], binary=True, truncate=True)
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 1
+
+    commuter.copy_from("test_table", data, truncate=True, chunksize=2)
+    commuter.copy_from("test_table", data, binary=True, truncate=True, chunksize=2)
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 3
+
+    with pytest.raises(ValueError):
+        commuter.copy_from("test_table", data, where="var_2 > 0", truncate=True)
+
+
+@with_table("test_table", create_test_table)
+def test_keys_cache():
+    data = create_test_data()
+    commuter.copy_from("test_table", data)
+    assert commuter.resolve_primary_conflicts("test_table", data).empty
+    assert ("primary_key", "public", "test_table") in commuter._metadata_cache
+
+    commuter.execute("ALTER TABLE test_table DROP CONSTRAINT test_table_pkey")
+    assert len(commuter.resolve_primary_conflicts("test_table", data)) == 3
+
+
+@with_table("test_table", create_test_table)
+def test_refresh_table_metadata():
+    commuter.copy_from("test_table", create_test_data(), format_data=True)
+    key = ("columns", "model", "test_table")
+    commuter._metadata_cache[key] = pd.DataFrame()
+
+    commuter.refresh_metadata("model.fake_table")
+    assert len(commuter._metadata_cache) == 2
+
+    commuter.refresh_metadata("test_table")
+    assert list(commuter._metadata_cache) == [key]
+    commuter.refresh_metadata()
+
+
+@with_table("test_table", create_test_table)
+def test_format_float32_integers():
+    data = create_test_data()
+    data["var_5"] = np.array([1.4, np.nan, 2.6], dtype=np.float32)
+    commuter.copy_from("test_table", data, format_data=True)
+    df = commuter.select("SELECT var_5 FROM test_table ORDER BY var_2")
+    assert df["var_5"].to_list()[::2] == [1, 3]
+
+
+@with_table("test_table", create_test_table)
+def test_transaction():
+    data = create_test_data()
+
+    with commuter.transaction():
+        commuter.insert("test_table", data.iloc[:1])
+        with commuter.transaction():
+            commuter.copy_from("test_table", data.iloc[1:2])
+        df = commuter.resolve_primary_conflicts("test_table", data)
+        df = commuter.resolve_primary_conflicts("test_table", df)
+        assert df["var_2"].to_list() == [3]
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 2
+
+    with pytest.raises(ValueError):
+        with commuter.transaction():
+            commuter.execute("DELETE FROM test_table WHERE var_2 = 1")
+            raise ValueError()
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 2
+
+    with pytest.raises(exc.QueryExecutionError):
+        with commuter.transaction():
+            commuter.insert("test_table", data.iloc[2:])
+            commuter.insert("test_table", data.iloc[2:])
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 2
+
+    with pytest.raises(exc.QueryExecutionError):
+        with commuter.transaction():
+            commuter.insert("test_table", data.iloc[2:])
+            try:
+                commuter.insert("test_table", data.iloc[2:])
+            except exc.QueryExecutionError:
+                pass
+    assert commuter.select_one("SELECT COUNT(*) FROM test_table") == 2
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
+from psycopg2.extras import DictCursor
+
 from pgcom import Connector, Commuter
 from .conftest import commuter, conn_params
 
@@ -13,6 +16,35 @@ def test_connection():
         assert conn is not None
 
 
+def test_connector_context():
+    with Connector(**conn_params) as connector:
+        with connector.open_connection() as conn:
+            assert conn is not None
+    assert connector._pool.closed
+
+
+def test_commuter_context():
+    with Commuter(**conn_params) as db:
+        assert db.select_one("SELECT 1") == 1
+    assert db.connector._pool.closed
+
+
+def test_connector_attributes():
+    connector = Connector(**conn_params, pre_ping=True)
+    with patch.object(connector, "ping", return_value=True) as ping:
+        with connector.open_connection() as conn:
+            assert conn is not None
+    assert ping.called
+    connector.close_all()
+
+
+def test_connector_finalize():
+    connector = Connector(**conn_params)
+    _pool = connector._pool
+    del connector
+    assert _pool.closed
+
+
 def test_connection_keywords():
     _commuter = Commuter(**conn_params, sslmode="allow")
     with _commuter.connector.open_connection() as conn:
@@ -58,6 +90,38 @@ def test_multiple_pool_connection():
     del _commuter
 
 
+def test_threaded_pool_connection():
+    with Commuter(**conn_params, pool_size=5) as _commuter:
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            values = list(
+                executor.map(lambda _: _commuter.select_one("SELECT 1"), range(50))
+            )
+    assert values == [1] * 50
+
+
+def test_exhausted_pool():
+    with Commuter(**conn_params, pool_size=2) as _commuter:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(
+                executor.map(
+                    lambda _: _commuter.select_one("SELECT 1 FROM pg_sleep(0.05)"),
+                    range(8),
+                )
+            )
+    assert values == [1] * 8
+
+
+def test_restart_pool_in_use():
+    with Commuter(**conn_params, pre_ping=True) as _commuter:
+        connector = _commuter.connector
+        with connector.open_connection() as conn:
+            with patch.object(Connector, "ping", new=_ping):
+                with connector.open_connection() as new_conn:
+                    assert new_conn is not None
+            assert conn.closed
+        assert _commuter.select_one("SELECT 1") == 1
+
+
 def test_reconnect():
     _commuter = Commuter(**conn_params, pre_ping=True, max_reconnects=2)
     with _commuter.connector.open_connection() as conn:
@@ -68,3 +132,22 @@ def test_reconnect():
             assert conn is not None
 
     del _commuter
+
+
+def test_pre_ping_execute():
+    _commuter = Commuter(**conn_params, pre_ping=True)
+    assert _commuter.select_one("SELECT 1") == 1
+    _commuter.execute("SELECT 1")
+    assert not _commuter.is_table_exist("fake_table")
+    with _commuter.transaction():
+        assert _commuter.select_one("SELECT 2") == 2
+    _commuter.close()
+
+
+def test_cursor_factory():
+    with Commuter(**conn_params, cursor_factory=DictCursor) as _commuter:
+        with _commuter.connector.open_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 AS value")
+                assert cur.fetchone()["value"] == 1
+        assert _commuter.select("SELECT 1 AS value")["value"].to_list() == [1]